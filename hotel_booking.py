@@ -1,52 +1,293 @@
 import json
 import os
-from datetime import datetime, timedelta
+import sys
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict, defaultdict
+from datetime import date, datetime
+
+try:
+    import orjson
+except ImportError:  # optional speedup; fall back to stdlib json
+    orjson = None
+
+
+def _loads(data):
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # e.g. escaped lone surrogates, which json reads back
+    return json.loads(data)
+
+
+def _dumps(obj):
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except orjson.JSONEncodeError:
+            pass  # e.g. ints beyond 64 bits or lone surrogates, which json writes
+    return json.dumps(obj, separators=(',', ':'), default=str).encode('utf-8')
+
+
+class _SortedInts(list):
+    """Plain sorted list of ints, kept in order with bisect.insort."""
+
+    def __init__(self, iterable=()):
+        super().__init__(sorted(iterable))
+
+    def add(self, value):
+        insort(self, value)
+
+    def remove(self, value):
+        del self[bisect_left(self, value)]
+
+    def bisect_left(self, value):
+        return bisect_left(self, value)
+
+    def bisect_right(self, value):
+        return bisect_right(self, value)
+
+
+def _count_overlaps(starts, ends, cin, cout):
+    """Count stays overlapping [cin, cout) given sorted start/end ordinals."""
+    # every stay ends after it starts, so the stays starting before our
+    # check-out, minus those already over by our check-in, are the overlaps;
+    # that only holds for cin <= cout, so never report a negative count
+    return max(0, starts.bisect_left(cout) - ends.bisect_right(cin))
+
+
+def _booking_number(bid):
+    """Numeric suffix of a BK0001-style booking ID, or 0 for other IDs."""
+    if bid.startswith('BK'):
+        try:
+            return int(bid[2:])
+        except ValueError:
+            pass
+    return 0
+
+
+def _make_avail_fn(starts, ends):
+    """Build the available-rooms check for one room type.
+
+    The columns' bisect methods are bound as default arguments, so each
+    call is two bisects on local names. The room total is passed in by the
+    caller, so changes to HotelBookingSystem.rooms take effect at once.
+    """
+    def avail(cin, cout, total,
+              bisect_in=starts.bisect_left, bisect_out=ends.bisect_right):
+        return max(0, total - max(0, bisect_in(cout) - bisect_out(cin)))
+    return avail
+
+
+def _public(booking):
+    """Drop the underscore-prefixed cache fields before writing a record."""
+    return {k: v for k, v in booking.items() if not k.startswith('_')}
+
+
+def _parse_iso_date(value):
+    """Parse a YYYY-MM-DD date, or return None if it is malformed."""
+    # fromisoformat also takes week dates such as 2024-W01-1, so only
+    # use it as a fast path for strings of the zero-padded shape
+    try:
+        if len(value) == 10 and value[4] == '-' and value[7] == '-':
+            return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        # strptime also accepts unpadded dates such as 2024-1-5
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return None
+
+
+def _ordinal(value):
+    parsed = _parse_iso_date(value)
+    return None if parsed is None else parsed.toordinal()
+
+
+def _holds_room(booking):
+    """True if a cached booking counts against availability."""
+    # records with malformed or inverted dates stay listed but never occupy
+    # a room; the bisect overlap count relies on every stay ending after it starts
+    return (booking.get('status') == 'confirmed'
+            and booking['_in'] is not None and booking['_out'] is not None
+            and booking['_in'] < booking['_out'])
+
 
 class HotelBookingSystem:
+    # max (room_type, check_in, check_out) entries kept in the availability cache
+    avail_cache_size = 4096
+
     def __init__(self, filename='bookings.json'):
         self.filename = filename
-        self.bookings = self.load_bookings()
+        self._avail_cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
         # define rooms: price per night and total count
         self.rooms = {
             'single': {'price': 2000, 'total': 10},
             'double': {'price': 2500, 'total': 8},
             'suite':  {'price': 3000, 'total': 5}
         }
+        self._bookings = None  # read from the log on first access
+
+    @property
+    def bookings(self):
+        self._ensure_loaded()
+        return self._bookings
+
+    @bookings.setter
+    def bookings(self, bookings):
+        self._bookings = bookings
+        self._build_indexes()
+        # the log may not match the new list, so rewrite it on the next write
+        self._needs_compact = True
+
+    def _ensure_loaded(self):
+        # defers parsing the log, and building the indexes, until needed
+        if self._bookings is None:
+            self.reload()
+
+    def reload(self):
+        """Re-read the bookings from the log and rebuild the indexes."""
+        self._bookings = self.load_bookings()
+        self._build_indexes()
 
     # ---------- persistence ----------
+    # The bookings file is an append-only log with one JSON record per line:
+    # a full booking when it is created, and {"op": "cancel", ...} when it is
+    # cancelled. Older files holding a single JSON array are still readable
+    # and get rewritten as a log on the next write.
     def load_bookings(self):
-        if os.path.exists(self.filename):
-            with open(self.filename, 'r') as f:
-                try:
-                    return json.load(f)
-                except json.JSONDecodeError:
-                    return []
-        return []
+        """Read the bookings from the log; does not touch self.bookings."""
+        return self._read_log()
+
+    def _build_indexes(self):
+        starts, ends = defaultdict(list), defaultdict(list)
+        max_n = 0
+        self._by_id = {}
+        for b in self._bookings:
+            self._cache_fields(b)
+            self._by_id.setdefault(b['booking_id'], b)
+            max_n = max(max_n, _booking_number(b.get('booking_id', '')))
+            if _holds_room(b):
+                starts[b['room_type']].append(b['_in'])
+                ends[b['room_type']].append(b['_out'])
+        # room_type -> sorted check-in / check-out ordinals of confirmed stays,
+        # each column sorted once here rather than built insert by insert
+        self._starts = defaultdict(_SortedInts, {rt: _SortedInts(v) for rt, v in starts.items()})
+        self._ends = defaultdict(_SortedInts, {rt: _SortedInts(v) for rt, v in ends.items()})
+        self._avail_fn = {rt: _make_avail_fn(self._starts[rt], self._ends[rt])
+                          for rt in self.rooms}
+        self._next_bid = max_n + 1
+        self._avail_cache.clear()
+
+    def _read_log(self):
+        self._log_records = 0
+        self._needs_compact = False
+        if not os.path.exists(self.filename):
+            return []
+        with open(self.filename, 'rb') as f:
+            data = f.read()
+        if data.lstrip()[:1] == b'[':
+            self._needs_compact = True
+            try:
+                return _loads(data)
+            except ValueError:  # covers json/orjson JSONDecodeError
+                return []
+        lines = [line for line in data.splitlines() if line.strip()]
+        self._log_records = len(lines)
+        try:
+            # decode the whole log in a single call
+            records = _loads(b'[' + b','.join(lines) + b']')
+        except ValueError:
+            records = self._decode_lines(lines)
+        by_id = {}
+        for record in records:
+            if record.get('op') == 'cancel':
+                booking = by_id.get(record.get('booking_id'))
+                if booking is not None:
+                    booking['status'] = 'cancelled'
+                    # cancelled_at_ns, or cancelled_at in older logs
+                    booking.update((k, v) for k, v in record.items()
+                                   if k.startswith('cancelled_at'))
+            else:
+                by_id[record['booking_id']] = record
+        return list(by_id.values())
+
+    def _decode_lines(self, lines):
+        records = []
+        for line in lines:
+            try:
+                records.append(_loads(line))
+            except ValueError:
+                # torn write; rewrite the log before appending after it
+                self._needs_compact = True
+        return records
 
     def save_bookings(self):
-        with open(self.filename, 'w') as f:
-            json.dump(self.bookings, f, indent=2, default=str)
+        """Rewrite the whole log as one line per booking."""
+        tmp = self.filename + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(b''.join(_dumps(_public(b)) + b'\n' for b in self.bookings))
+        os.replace(tmp, self.filename)
+        self._log_records = len(self.bookings)
+        self._needs_compact = False
+
+    def compact(self):
+        """Rewrite the log as one line per booking, dropping cancel records.
+
+        Not run automatically; call it to shrink a log with many cancellations.
+        """
+        self._ensure_loaded()
+        if self._needs_compact or self._log_records > len(self.bookings):
+            self.save_bookings()
+            return True
+        return False
+
+    def _append_line(self, line):
+        """Append one record already encoded by _dumps, newline included."""
+        if self._needs_compact:
+            # in-memory bookings already include this change
+            self.save_bookings()
+            return
+        with open(self.filename, 'ab') as f:
+            f.write(line)
+        self._log_records += 1
 
     # ---------- helpers ----------
+    def _cache_fields(self, booking):
+        """Cache the stay dates (as ordinal days, None if malformed) and lowercased search text."""
+        booking['_in'] = _ordinal(booking.get('check_in'))
+        booking['_out'] = _ordinal(booking.get('check_out'))
+        # joined with a unit separator so one substring check covers all three
+        booking['_haystack'] = '\x1f'.join(
+            (booking['guest_name'], booking['email'], booking['booking_id'])).lower()
+
+    def _add_stay(self, booking):
+        self._starts[booking['room_type']].add(booking['_in'])
+        self._ends[booking['room_type']].add(booking['_out'])
+
+    def _remove_stay(self, booking):
+        self._starts[booking['room_type']].remove(booking['_in'])
+        self._ends[booking['room_type']].remove(booking['_out'])
+
     def generate_booking_id(self):
-        # find highest numeric suffix in existing IDs BK0001 etc.
-        max_n = 0
-        for b in self.bookings:
-            bid = b.get('booking_id', '')
-            if bid.startswith('BK'):
-                try:
-                    n = int(bid[2:])
-                    if n > max_n:
-                        max_n = n
-                except ValueError:
-                    pass
-        return f"BK{max_n + 1:04d}"
+        # one past the highest numeric suffix seen in IDs BK0001 etc.
+        self._ensure_loaded()
+        bid = f"BK{self._next_bid:04d}"
+        self._next_bid += 1
+        return bid
 
     def parse_date(self, date_str):
-        try:
-            return datetime.strptime(date_str, '%Y-%m-%d').date()
-        except Exception:
-            return None
+        # same rules as for the dates stored in the log
+        return _parse_iso_date(date_str)
+
+    @staticmethod
+    def _fmt_ts(ns):
+        """Format a time.time_ns() timestamp for display."""
+        return datetime.fromtimestamp(ns / 1e9).isoformat(timespec='seconds')
 
     def calculate_nights(self, check_in, check_out):
         date_in = self.parse_date(check_in)
@@ -64,28 +305,47 @@ class HotelBookingSystem:
         """Count confirmed bookings of room_type that overlap the given range."""
         date_in = self.parse_date(check_in)
         date_out = self.parse_date(check_out)
-        if date_in is None or date_out is None:
+        if date_in is None or date_out is None or date_out < date_in:
             return None
-        count = 0
-        for b in self.bookings:
-            if b.get('room_type') != room_type:
-                continue
-            if b.get('status') != 'confirmed':
-                continue
-            b_in = self.parse_date(b['check_in'])
-            b_out = self.parse_date(b['check_out'])
-            if self.dates_overlap(date_in, date_out, b_in, b_out):
-                count += 1
-        return count
+        self._ensure_loaded()
+        if room_type not in self._starts:
+            return 0
+        return _count_overlaps(self._starts[room_type], self._ends[room_type],
+                               date_in.toordinal(), date_out.toordinal())
+
+    def _avail_fn_for(self, room_type):
+        # room types added to self.rooms after loading get their check here
+        avail_fn = self._avail_fn.get(room_type)
+        if avail_fn is None:
+            avail_fn = self._avail_fn[room_type] = _make_avail_fn(
+                self._starts[room_type], self._ends[room_type])
+        return avail_fn
 
     def available_rooms_for_range(self, room_type, check_in, check_out):
         """Return number of available rooms of given type for the date range."""
-        if room_type not in self.rooms:
-            return None
-        booked = self.booked_count_for_range(room_type, check_in, check_out)
-        if booked is None:
+        room = self.rooms.get(room_type)
+        if room is None:
             return None
-        return max(0, self.rooms[room_type]['total'] - booked)
+        # the total is part of the key, so a changed room count is a miss
+        key = (room_type, room['total'], check_in, check_out)
+        cache = self._avail_cache
+        if key in cache:
+            cache.move_to_end(key)
+            self.cache_hits += 1
+            return cache[key]
+        self.cache_misses += 1
+        date_in = self.parse_date(check_in)
+        date_out = self.parse_date(check_out)
+        if date_in is None or date_out is None or date_out < date_in:
+            available = None
+        else:
+            self._ensure_loaded()
+            available = self._avail_fn_for(room_type)(
+                date_in.toordinal(), date_out.toordinal(), room['total'])
+        cache[key] = available
+        if len(cache) > self.avail_cache_size:
+            cache.popitem(last=False)
+        return available
 
     # ---------- CRUD ----------
     def create_booking(self, guest_name, email, phone, room_type, check_in, check_out, guests):
@@ -118,51 +378,65 @@ class HotelBookingSystem:
             'nights': nights,
             'total_price': total_price,
             'status': 'confirmed',
-            'created_at': datetime.now().isoformat()
+            'created_at_ns': time.time_ns()
         }
+        # encode before touching any state, so a record that cannot be
+        # written leaves no trace in memory either
+        line = _dumps(booking) + b'\n'
 
+        self._cache_fields(booking)
+        self._add_stay(booking)
+        self._avail_cache.clear()
         self.bookings.append(booking)
-        self.save_bookings()
+        self._by_id[booking['booking_id']] = booking
+        self._append_line(line)
         return booking, "Booking created successfully"
 
     def get_booking(self, booking_id):
-        for booking in self.bookings:
-            if booking['booking_id'] == booking_id:
-                return booking
-        return None
+        self._ensure_loaded()
+        return self._by_id.get(booking_id)
 
     def get_all_bookings(self):
         return self.bookings
 
     def cancel_booking(self, booking_id):
-        for booking in self.bookings:
-            if booking['booking_id'] == booking_id:
-                if booking['status'] == 'cancelled':
-                    return booking  # already cancelled
-                booking['status'] = 'cancelled'
-                booking['cancelled_at'] = datetime.now().isoformat()
-                self.save_bookings()
-                return booking
-        return None
+        self._ensure_loaded()
+        booking = self._by_id.get(booking_id)
+        if booking is None:
+            return None
+        if booking['status'] == 'cancelled':
+            return booking  # already cancelled
+        cancelled_at_ns = time.time_ns()
+        line = _dumps({
+            'op': 'cancel',
+            'booking_id': booking_id,
+            'cancelled_at_ns': cancelled_at_ns
+        }) + b'\n'
+        if _holds_room(booking):
+            self._remove_stay(booking)
+            self._avail_cache.clear()
+        booking['status'] = 'cancelled'
+        booking['cancelled_at_ns'] = cancelled_at_ns
+        self._append_line(line)
+        return booking
 
     def search_bookings(self, query):
         results = []
         query_lower = query.lower()
+        if '\x1f' in query_lower:
+            return results  # would match across field boundaries
         for booking in self.bookings:
-            if (query_lower in booking['guest_name'].lower() or
-                query_lower in booking['email'].lower() or
-                query_lower in booking['booking_id'].lower()):
+            if query_lower in booking['_haystack']:
                 results.append(booking)
         return results
 
     def get_available_rooms(self):
         """Return availability for today (simple helper)."""
-        today = datetime.now().date().isoformat()
-        tomorrow = (datetime.now().date() + timedelta(days=1)).isoformat()
-        availability = {}
-        for room_type in self.rooms:
-            availability[room_type] = self.available_rooms_for_range(room_type, today, tomorrow)
-        return availability
+        # one pass over the per-type checks, with no date strings to format or parse
+        self._ensure_loaded()
+        today = date.today().toordinal()
+        return {room_type: self._avail_fn_for(room_type)(today, today + 1, info['total'])
+                for room_type, info in self.rooms.items()}
 
 # ---------- CLI ----------
 if __name__ == '__main__':
@@ -208,11 +482,16 @@ if __name__ == '__main__':
         elif choice == '2':
             bookings = system.get_all_bookings()
             if bookings:
-                print("\n--- All Bookings ---")
+                # build the listing and write it once rather than print per line
+                out = ["\n--- All Bookings ---"]
                 for b in bookings:
-                    print(f"\nID: {b['booking_id']} | Guest: {b['guest_name']} | Room: {b['room_type'].capitalize()}")
-                    print(f"Check-in: {b['check_in']} | Check-out: {b['check_out']} | Status: {b['status']}")
-                    print(f"Total: ₹{b['total_price']} ({b['nights']} nights)")
+                    out.append(f"\nID: {b['booking_id']} | Guest: {b['guest_name']} | Room: {b['room_type'].capitalize()}")
+                    out.append(f"Check-in: {b['check_in']} | Check-out: {b['check_out']} | Status: {b['status']}")
+                    # bookings made before created_at_ns carry an ISO string
+                    booked = (system._fmt_ts(b['created_at_ns']) if 'created_at_ns' in b
+                              else b.get('created_at', '-'))
+                    out.append(f"Total: ₹{b['total_price']} ({b['nights']} nights) | Booked: {booked}")
+                sys.stdout.write('\n'.join(out) + '\n')
             else:
                 print("\nNo bookings found.")
 
@@ -220,10 +499,11 @@ if __name__ == '__main__':
             query = input("Search (Booking ID/Name/Email): ").strip()
             results = system.search_bookings(query)
             if results:
-                print("\n--- Search Results ---")
+                out = ["\n--- Search Results ---"]
                 for b in results:
-                    print(f"\nID: {b['booking_id']} | Guest: {b['guest_name']} | Room: {b['room_type'].capitalize()}")
-                    print(f"Check-in: {b['check_in']} | Check-out: {b['check_out']} | Status: {b['status']}")
+                    out.append(f"\nID: {b['booking_id']} | Guest: {b['guest_name']} | Room: {b['room_type'].capitalize()}")
+                    out.append(f"Check-in: {b['check_in']} | Check-out: {b['check_out']} | Status: {b['status']}")
+                sys.stdout.write('\n'.join(out) + '\n')
             else:
                 print("\nNo matches found.")
 
@@ -0,0 +1,240 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import date
+
+from hotel_booking import HotelBookingSystem
+
+
+class BookingLogTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.filename = os.path.join(self.tmpdir.name, 'bookings.json')
+
+    def open_system(self):
+        return HotelBookingSystem(self.filename)
+
+    def book(self, system, check_in='2024-01-01', check_out='2024-01-05'):
+        booking, message = system.create_booking(
+            'Asha', 'asha@example.com', '555', 'single', check_in, check_out, 1)
+        self.assertIsNotNone(booking, message)
+        return booking
+
+    def read_lines(self):
+        with open(self.filename, 'rb') as f:
+            return f.read().splitlines()
+
+    def test_replay_restores_bookings_and_cancellations(self):
+        system = self.open_system()
+        self.book(system)
+        self.book(system, '2024-02-01', '2024-02-03')
+        system.cancel_booking('BK0001')
+
+        self.assertEqual(len(self.read_lines()), 3)
+        reopened = self.open_system()
+        self.assertEqual([b['booking_id'] for b in reopened.bookings], ['BK0001', 'BK0002'])
+        self.assertEqual(reopened.get_booking('BK0001')['status'], 'cancelled')
+        self.assertEqual(reopened.get_booking('BK0002')['status'], 'confirmed')
+        self.assertEqual(reopened.available_rooms_for_range('single', '2024-01-01', '2024-01-05'), 10)
+        self.assertEqual(reopened.generate_booking_id(), 'BK0003')
+
+    def test_legacy_array_is_migrated_on_next_write(self):
+        legacy = [{
+            'booking_id': 'BK0001', 'guest_name': 'Ravi', 'email': 'ravi@example.com',
+            'phone': '555', 'room_type': 'suite', 'check_in': '2024-01-01',
+            'check_out': '2024-01-03', 'guests': 2, 'nights': 2, 'total_price': 6000,
+            'status': 'confirmed', 'created_at': '2024-01-01T10:00:00',
+        }]
+        with open(self.filename, 'w') as f:
+            json.dump(legacy, f, indent=2)
+
+        system = self.open_system()
+        self.assertEqual(system.get_booking('BK0001')['guest_name'], 'Ravi')
+        self.book(system)
+
+        records = [json.loads(line) for line in self.read_lines()]
+        self.assertEqual([r['booking_id'] for r in records], ['BK0001', 'BK0002'])
+        self.assertEqual(len(self.open_system().bookings), 2)
+
+    def test_torn_tail_is_dropped_and_rewritten(self):
+        system = self.open_system()
+        self.book(system)
+        with open(self.filename, 'ab') as f:
+            f.write(b'{"booking_id": "BK00')
+
+        reopened = self.open_system()
+        self.assertEqual([b['booking_id'] for b in reopened.bookings], ['BK0001'])
+        self.book(reopened, '2024-03-01', '2024-03-02')
+
+        records = [json.loads(line) for line in self.read_lines()]
+        self.assertEqual([r['booking_id'] for r in records], ['BK0001', 'BK0002'])
+
+    def test_compact_drops_cancel_records(self):
+        system = self.open_system()
+        self.book(system)
+        system.cancel_booking('BK0001')
+        self.assertEqual(len(self.read_lines()), 2)
+        self.assertTrue(system.compact())
+        self.assertEqual(len(self.read_lines()), 1)
+        self.assertFalse(system.compact())
+        self.assertEqual(self.open_system().get_booking('BK0001')['status'], 'cancelled')
+
+    def test_append_after_another_instance_rewrites_log(self):
+        first = self.open_system()
+        self.book(first)
+        second = self.open_system()
+        second.cancel_booking('BK0001')
+        second.compact()
+        self.book(first, '2024-02-01', '2024-02-03')
+
+        reopened = self.open_system()
+        self.assertEqual(reopened.get_booking('BK0001')['status'], 'cancelled')
+        self.assertEqual(reopened.get_booking('BK0002')['status'], 'confirmed')
+
+    def test_values_orjson_cannot_encode_still_round_trip(self):
+        system = self.open_system()
+        big, message = system.create_booking(
+            'Asha', 'asha@example.com', '555', 'single', '2024-01-01', '2024-01-05', 10**20)
+        self.assertIsNotNone(big, message)
+        odd, message = system.create_booking(
+            'a\udcff', 'a@example.com', '555', 'single', '2024-01-01', '2024-01-05', 1)
+        self.assertIsNotNone(odd, message)
+
+        reopened = self.open_system()
+        self.assertEqual(len(reopened.bookings), 2)
+        self.assertEqual(reopened.get_booking('BK0001')['guests'], 10**20)
+        self.assertEqual(reopened.get_booking('BK0002')['guest_name'], 'a\udcff')
+        self.assertEqual(reopened.available_rooms_for_range('single', '2024-01-01', '2024-01-05'), 8)
+
+    def test_malformed_stored_date_does_not_break_access(self):
+        system = self.open_system()
+        self.book(system)
+        bad = {
+            'booking_id': 'BK0002', 'guest_name': 'Meera', 'email': 'meera@example.com',
+            'phone': '555', 'room_type': 'single', 'check_in': 'bad',
+            'check_out': '2024-01-05', 'guests': 1, 'nights': 4, 'total_price': 8000,
+            'status': 'confirmed', 'created_at_ns': 0,
+        }
+        with open(self.filename, 'a') as f:
+            f.write(json.dumps(bad) + '\n')
+
+        reopened = self.open_system()
+        self.assertEqual(len(reopened.get_all_bookings()), 2)
+        self.assertEqual(reopened.search_bookings('meera')[0]['booking_id'], 'BK0002')
+        self.assertEqual(reopened.available_rooms_for_range('single', '2024-01-01', '2024-01-05'), 9)
+        self.assertEqual(reopened.cancel_booking('BK0002')['status'], 'cancelled')
+        self.book(reopened, '2024-03-01', '2024-03-02')
+        self.assertEqual(reopened.get_booking('BK0003')['status'], 'confirmed')
+
+    def test_check_out_before_check_in_is_invalid(self):
+        system = self.open_system()
+        self.book(system)
+        self.assertIsNone(system.booked_count_for_range('single', '2024-01-10', '2024-01-01'))
+        self.assertIsNone(system.available_rooms_for_range('single', '2024-01-10', '2024-01-01'))
+        self.assertEqual(system.booked_count_for_range('single', '2024-01-01', '2024-01-10'), 1)
+        self.assertEqual(system.available_rooms_for_range('single', '2024-01-01', '2024-01-10'), 9)
+
+    def test_parse_date_accepts_what_strptime_did(self):
+        system = self.open_system()
+        self.assertEqual(system.parse_date('2030-01-05'), date(2030, 1, 5))
+        self.assertEqual(system.parse_date('2030-1-5'), date(2030, 1, 5))
+        self.assertIsNone(system.parse_date('2024-W01-1'))
+        self.assertIsNone(system.parse_date('20240101'))
+        self.assertIsNone(system.parse_date('2024-02-30'))
+        self.assertIsNone(system.parse_date(None))
+        booking, message = system.create_booking(
+            'Asha', 'asha@example.com', '555', 'single', '2030-1-5', '2030-1-7', 1)
+        self.assertIsNotNone(booking, message)
+        self.assertEqual(booking['nights'], 2)
+
+    def test_room_changes_apply_to_availability(self):
+        system = self.open_system()
+        self.book(system)
+        self.assertEqual(system.available_rooms_for_range('single', '2024-01-01', '2024-01-05'), 9)
+        system.rooms['single']['total'] = 1
+        self.assertEqual(system.available_rooms_for_range('single', '2024-01-01', '2024-01-05'), 0)
+        self.assertEqual(system.get_available_rooms()['single'], 1)
+        booking, message = system.create_booking(
+            'Asha', 'asha@example.com', '555', 'single', '2024-01-02', '2024-01-03', 1)
+        self.assertIsNone(booking)
+
+        system.rooms['family'] = {'price': 4000, 'total': 2}
+        booking, message = system.create_booking(
+            'Asha', 'asha@example.com', '555', 'family', '2024-01-01', '2024-01-05', 4)
+        self.assertIsNotNone(booking, message)
+        self.assertEqual(system.available_rooms_for_range('family', '2024-01-01', '2024-01-05'), 1)
+        self.assertEqual(system.get_available_rooms()['family'], 2)
+
+    def test_availability_cache_hits_and_invalidation(self):
+        system = self.open_system()
+        self.book(system)
+        args = ('single', '2024-01-01', '2024-01-05')
+        system.cache_hits = system.cache_misses = 0
+        self.assertEqual(system.available_rooms_for_range(*args), 9)
+        self.assertEqual(system.available_rooms_for_range(*args), 9)
+        self.assertEqual((system.cache_hits, system.cache_misses), (1, 1))
+
+        self.book(system, '2024-01-03', '2024-01-04')
+        system.cache_hits = system.cache_misses = 0
+        self.assertEqual(system.available_rooms_for_range(*args), 8)
+        self.assertEqual((system.cache_hits, system.cache_misses), (0, 1))
+        system.cancel_booking('BK0001')
+        self.assertEqual(system.available_rooms_for_range(*args), 9)
+        self.assertEqual((system.cache_hits, system.cache_misses), (0, 2))
+
+    def test_availability_cache_evicts_least_recently_used(self):
+        system = self.open_system()
+        system.avail_cache_size = 2
+        first = ('single', '2024-01-01', '2024-01-02')
+        system.available_rooms_for_range(*first)
+        system.available_rooms_for_range('single', '2024-01-02', '2024-01-03')
+        system.available_rooms_for_range(*first)
+        system.available_rooms_for_range('single', '2024-01-03', '2024-01-04')
+        self.assertEqual(len(system._avail_cache), 2)
+        system.available_rooms_for_range(*first)
+        system.available_rooms_for_range('single', '2024-01-02', '2024-01-03')
+        self.assertEqual((system.cache_hits, system.cache_misses), (2, 4))
+
+    def test_search_does_not_match_across_fields(self):
+        system = self.open_system()
+        self.book(system)
+        self.assertEqual(len(system.search_bookings('ASHA@example')), 1)
+        self.assertEqual(len(system.search_bookings('bk0001')), 1)
+        self.assertEqual(system.search_bookings('asha\x1fasha'), [])
+        self.assertEqual(system.search_bookings('a\x1fb'), [])
+
+    def test_bookings_load_on_first_access(self):
+        self.book(self.open_system())
+        system = self.open_system()
+        self.assertEqual(system.rooms['single']['total'], 10)
+        self.assertIsNone(system._bookings)
+        self.assertEqual(len(system.bookings), 1)
+        self.assertIsNotNone(system._bookings)
+
+    def test_load_bookings_leaves_state_alone(self):
+        system = self.open_system()
+        self.book(system)
+        self.assertEqual(len(system.load_bookings()), 1)
+        system.cancel_booking('BK0001')
+        self.assertEqual(system.bookings[0]['status'], 'cancelled')
+        self.assertEqual(self.open_system().get_booking('BK0001')['status'], 'cancelled')
+
+    def test_reload_picks_up_other_writers(self):
+        system = self.open_system()
+        self.book(system)
+        other = self.open_system()
+        other.cancel_booking('BK0001')
+        self.book(other, '2024-02-01', '2024-02-03')
+
+        system.reload()
+        self.assertEqual(system.get_booking('BK0001')['status'], 'cancelled')
+        self.assertEqual(system.available_rooms_for_range('single', '2024-01-01', '2024-01-05'), 10)
+        system.bookings = system.load_bookings()
+        self.assertIs(system.get_booking('BK0002'), system.bookings[1])
+        self.assertEqual(system.generate_booking_id(), 'BK0003')
+
+
+if __name__ == '__main__':
+    unittest.main()